@@ -1,15 +1,50 @@
 # JWTToken.py
 
+import base64
+import hashlib
+import hmac
+import logging
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
-from jose import JWTError, jwt
-from util import logger
+import jwt
+import orjson
+from jwt import DecodeError, InvalidTokenError as JWTError
+from caches import make_token_cache
+
+_log = logging.getLogger(__name__)
+
+# Digests for the HMAC algorithms whose signatures JWTToken checks itself
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class _OrjsonJWT(jwt.PyJWT):
+    """PyJWT with claims parsed by orjson instead of the stdlib json module."""
+
+    def _decode_payload(self, decoded: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except orjson.JSONDecodeError as e:
+            raise DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+
+_jwt_codec = _OrjsonJWT()
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    """Base64url-encodes bytes without padding, as JWT segments require."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
 
 class JWTToken:
     """
     A class for creating and verifying JWT tokens.
     """
-    def __init__(self, secret_key: str, algorithm: str = "HS256", access_token_expire_minutes: int = 30):
+    def __init__(self, secret_key: str, algorithm: str = "HS256", access_token_expire_minutes: int = 30,
+                 cache_ttl: float = 5.0, cache_size: int = 10_000):
         """
         Initializes the JWTToken class.
 
@@ -17,10 +52,34 @@ class JWTToken:
             secret_key: The secret key used to sign and verify tokens.
             algorithm: The algorithm used to sign the tokens (default: HS256).
             access_token_expire_minutes: The default expiration time for access tokens in minutes (default: 30).
+            cache_ttl: How long, in seconds, a verified token is trusted without re-decoding (default: 5).
+            cache_size: The maximum number of verified tokens kept in the cache (default: 10000).
         """
         self.secret_key = secret_key
         self.algorithm = algorithm
         self.access_token_expire_minutes = access_token_expire_minutes
+        self._default_delta = timedelta(minutes=access_token_expire_minutes)
+        # For HMAC algorithms, key the hash once and copy it per sign/verify,
+        # so each call skips the key setup; other algorithms are left to PyJWT
+        digestmod = _HMAC_DIGESTS.get(self.algorithm)
+        self._secret_bytes = secret_key.encode()
+        self._hmac = hmac.new(self._secret_bytes, digestmod=digestmod) if digestmod else None
+        # The header never changes, so its encoded segment is built once
+        self._header_segment = _b64url_encode(orjson.dumps({"alg": self.algorithm, "typ": "JWT"}))
+        # Decode settings are fixed per instance, so build them once
+        self._algorithms = [self.algorithm]
+        # Start from PyJWT's full defaults: with verify_signature off (the HMAC
+        # path checks it itself), PyJWT skips every claim check not set explicitly
+        self._decode_options = {
+            **_jwt_codec.options,
+            "verify_signature": self._hmac is None,
+            "require": ["sub", "exp"],
+        }
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # token hash -> (username, token exp epoch)
+        self._cache = make_token_cache(cache_size, cache_ttl)
+        self._cache_lock = threading.Lock()
 
     def create_access_token(self, username: str, expires_delta: timedelta | None = None) -> str:
         """
@@ -33,56 +92,103 @@ class JWTToken:
         Returns:
             The encoded JWT access token.
         """
-        to_encode = {"sub": username}  # "sub" claim holds the username
-        if expires_delta:
-            expire = datetime.now(timezone.utc) + expires_delta
-        else:
-            expire = datetime.now(timezone.utc) + timedelta(minutes=self.access_token_expire_minutes)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+        expire = datetime.now(timezone.utc) + (expires_delta or self._default_delta)
+        if self._hmac is None:
+            # "sub" claim holds the username
+            return jwt.encode({"sub": username, "exp": expire}, self.secret_key, algorithm=self.algorithm)
+
+        claims = {"sub": username, "exp": int(expire.timestamp())}
+        payload_segment = _b64url_encode(orjson.dumps(claims))
+        signing_input = self._header_segment + b"." + payload_segment
+        h = self._hmac.copy()
+        h.update(signing_input)
+        return (signing_input + b"." + _b64url_encode(h.digest())).decode()
+
+    def _cache_get(self, key: bytes) -> Optional[str]:
+        """Returns the cached username for a token hash if the entry is still fresh."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        return entry[0] if entry is not None else None
+
+    def _cache_put(self, key: bytes, username: str, token_exp: float):
+        """Stores a verified token hash, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            self._cache[key] = (username, token_exp)
+
+    def _check_header(self, token: str):
+        """
+        Rejects tokens whose header names another algorithm, standing in for
+        PyJWT's algorithm allow-list on the HMAC path.
+        """
+        header_segment = token.partition(".")[0]
+        try:
+            header_bytes = header_segment.encode()
+            if header_bytes == self._header_segment:
+                return
+            header = orjson.loads(base64.urlsafe_b64decode(header_bytes + b"=" * (-len(header_bytes) % 4)))
+        except ValueError as e:
+            raise DecodeError(f"Invalid header: {e}") from e
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+
+    def _verify_signature(self, token: str) -> bool:
+        """Checks the token's HMAC signature against the precomputed keyed hash."""
+        signing_input, _, signature = token.rpartition(".")
+        try:
+            expected = base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+            h = self._hmac.copy()
+            h.update(signing_input.encode())
+        except ValueError:
+            return False
+        return hmac.compare_digest(h.digest(), expected)
 
     def verify_token(self, token: str) -> Optional[str]:
         """
         Verifies a JWT token and returns the username if valid, None otherwise.
 
+        Recently verified tokens are served from a short-lived cache keyed by a
+        hash of the token, so the raw token is never stored.
+
         Args:
             token: The JWT token to verify.
 
         Returns:
             The username extracted from the token if valid, otherwise None.
         """
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached_username = self._cache_get(cache_key)
+        if cached_username is not None:
+            return cached_username
+
         try:
-            # Add leeway to handle slight time differences
-            payload = jwt.decode(
-                token, 
-                self.secret_key, 
-                algorithms=[self.algorithm],
-                options={"verify_signature": True, "verify_exp": True}
+            if self._hmac is not None:
+                self._check_header(token)
+                if not self._verify_signature(token):
+                    raise jwt.InvalidSignatureError("Signature verification failed")
+            payload = _jwt_codec.decode(
+                token,
+                self.secret_key,
+                algorithms=self._algorithms,
+                options=self._decode_options,
             )
-            logger("verify_token payload: ", payload)
-            username = payload.get("sub")
-            if username:
-                return username
-            else:
-                logger("Token verification failed: 'sub' claim is missing")
-                return None  # "sub" claim is missing
-
-        except JWTError as e:
-            logger(f"Token verification failed: {str(e)}")
+            _log.debug("verify_token payload: %s", payload)
+            username = payload["sub"]
+            self._cache_put(cache_key, username, float(payload["exp"]))
+            return username
+
+        except (JWTError, KeyError) as e:
+            _log.info("Token verification failed: %s", e)
             return None
 
 
 # Example usage
 if __name__ == "__main__":
     # Replace with your actual secret key.  **KEEP THIS SECRET!**
-    import configparser
-    # Load configuration from secret.ini
-    config = configparser.ConfigParser()
-    config.read('workspace/secret.ini')
+    from config import get_settings
+    from util import logger
 
     # Get the secret key from secret.ini
-    SECRET_KEY = config.get('security', 'secret_key')
+    SECRET_KEY = get_settings().secret_key
 
     
     # Initialize the JWTToken class with your secret key
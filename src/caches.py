@@ -0,0 +1,42 @@
+# caches.py
+
+import time
+from typing import Any, Tuple
+
+from cachetools import TLRUCache, TTLCache
+
+
+def make_token_cache(maxsize: int, ttl: float) -> TLRUCache:
+    """
+    Creates an LRU cache for verified tokens.
+
+    Values are (username, token exp epoch) tuples, and each entry expires at
+    the earlier of the token's own expiry and `ttl` seconds after insertion.
+    The cache is not thread-safe; guard it with a lock.
+
+    Args:
+        maxsize: The maximum number of entries.
+        ttl: The maximum time, in seconds, an entry is kept.
+
+    Returns:
+        The token cache.
+    """
+    def ttu(_key: Any, value: Tuple[str, float], now: float) -> float:
+        return min(value[1], now + ttl)
+
+    return TLRUCache(maxsize=maxsize, ttu=ttu, timer=time.time)
+
+
+def make_ttl_cache(maxsize: int, ttl: float) -> TTLCache:
+    """
+    Creates an LRU cache whose entries expire `ttl` seconds after insertion.
+    The cache is not thread-safe; guard it with a lock.
+
+    Args:
+        maxsize: The maximum number of entries.
+        ttl: The time, in seconds, an entry is kept.
+
+    Returns:
+        The TTL cache.
+    """
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,33 @@
+# config.py
+
+import configparser
+import functools
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings loaded from workspace/secret.ini."""
+    secret_key: str
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings(path: str = "workspace/secret.ini") -> Settings:
+    """
+    Reads secret.ini once and returns the cached settings on later calls.
+
+    Args:
+        path: The path to the INI file (default: workspace/secret.ini).
+
+    Returns:
+        The parsed Settings.
+    """
+    config = configparser.ConfigParser()
+    config.read(path)
+    return Settings(
+        secret_key=config.get('security', 'secret_key'),
+        algorithm=config.get('security', 'algorithm', fallback="HS256"),
+        access_token_expire_minutes=config.getint('security', 'access_token_expire_minutes', fallback=30),
+    )
@@ -0,0 +1,119 @@
+# jwt_auth_router.py
+
+import os
+import hashlib
+import logging
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import (HTTPAuthorizationCredentials, HTTPBearer,
+                              OAuth2PasswordRequestForm)
+from pydantic import BaseModel
+
+from caches import make_ttl_cache
+from config import get_settings
+from JWTToken import JWTToken
+from mydb import DB_PATH, LEGACY_JSON_PATH, MyDB, pwd_context
+
+_log = logging.getLogger(__name__)
+
+jwt_auth_router = APIRouter(prefix="/auth")
+
+
+class Token(BaseModel):
+    """Response body of the token endpoint."""
+    access_token: str
+    token_type: str
+
+
+# Initialize the database
+my_db = MyDB(DB_PATH, legacy_json_path=LEGACY_JSON_PATH)  # Initialize MyDB
+
+# Load configuration from secret.ini
+settings = get_settings()
+
+# Initialize JWTToken class
+jwt_token_handler = JWTToken(
+    secret_key=settings.secret_key,
+    algorithm=settings.algorithm,
+    access_token_expire_minutes=settings.access_token_expire_minutes,
+)
+
+# Security scheme
+http_bearer = HTTPBearer()
+
+# Opt-in cache of password verification verdicts (seconds, 0 disables it).
+# Keys hold a salted digest of the password, never the password itself.
+PASSWORD_CACHE_TTL = float(os.environ.get("PASSWORD_CACHE_TTL", 0))
+PASSWORD_CACHE_SIZE = 1024
+_password_cache_salt = os.urandom(16)
+_password_cache = make_ttl_cache(PASSWORD_CACHE_SIZE, PASSWORD_CACHE_TTL) if PASSWORD_CACHE_TTL > 0 else None
+_password_cache_lock = threading.Lock()
+
+def verify_password(username: str, plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against a hashed password."""
+    if _password_cache is None:
+        return pwd_context.verify(plain_password, hashed_password)
+
+    password_digest = hashlib.blake2b(plain_password.encode(), key=_password_cache_salt).digest()
+    key = (username, password_digest, hashed_password)
+    with _password_cache_lock:
+        verdict = _password_cache.get(key)
+    if verdict is not None:
+        return verdict
+
+    verdict = pwd_context.verify(plain_password, hashed_password)
+    with _password_cache_lock:
+        _password_cache[key] = verdict
+    return verdict
+
+async def get_user(username: str):
+    """Retrieve user data based on username."""
+    return await run_in_threadpool(my_db.get_user, username)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(http_bearer)):
+    """Dependency to get the current user from the JWT token."""
+    token = credentials.credentials
+    username = await run_in_threadpool(jwt_token_handler.verify_token, token)
+    _log.debug("get_current_user: %s", username)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await get_user(username)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return user
+
+
+@jwt_auth_router.post("/token")
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
+    """Endpoint to obtain a JWT access token."""
+    user = await get_user(form_data.username)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not await run_in_threadpool(verify_password, form_data.username, form_data.password, user["password"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Upgrade hashes from deprecated schemes (e.g. bcrypt) to argon2 on login
+    if pwd_context.needs_update(user["password"]):
+        new_hash = await run_in_threadpool(pwd_context.hash, form_data.password)
+        await run_in_threadpool(my_db.update_user, form_data.username, {"password": new_hash})
+
+    access_token = await run_in_threadpool(jwt_token_handler.create_access_token, username=form_data.username)
+    _log.debug("access token created for: %s", form_data.username)
+    return Token(access_token=access_token, token_type="bearer")
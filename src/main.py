@@ -1,27 +1,20 @@
 # main.py
 
 import os
-import configparser
+import sys
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 import httpx
-from typing import Any, Dict, Optional
-import asyncio
+from typing import Any, Dict
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 
-from fastapi import APIRouter, Depends, HTTPException, Security, status
-from fastapi.security import (HTTPAuthorizationCredentials, HTTPBearer,
-                              OAuth2PasswordRequestForm)
-
-from passlib.context import CryptContext
-
-
 from ServerTee import ServerTee
-from JWTToken import JWTToken
-from mydb import MyDB
-from util import logger
+from jwt_auth_router import get_current_user, jwt_auth_router
 
 
 # log name as today's date in YYYY-MM-DD format
@@ -30,11 +23,42 @@ today_date = datetime.now().strftime("%Y-%m-%d")
 log_file_path = f"log/{today_date}.log"
 # Initialize ServerTee with the dynamically generated log file path
 tee = ServerTee(log_file_path)
+# Route logging through the tee; %-style args are only formatted when emitted
+logging.basicConfig(
+    stream=sys.stdout,
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(levelname)s %(name)s: %(message)s",
+)
+# httpx logs every request at INFO; keep it off the per-request proxy path
+logging.getLogger("httpx").setLevel(logging.WARNING)
+_log = logging.getLogger(__name__)
 # Print the log file path for reference
-logger(log_file_path)
+_log.info(log_file_path)
+
+# Shared client for the backend, so connections are kept alive and reused
+BACKEND_BASE_URL = "http://backend:6000"
+# Headers that describe the client connection and must not be forwarded.
+# content-length is kept so a streamed body is sent with a fixed length
+# instead of being re-framed as chunked.
+HOP_BY_HOP_HEADERS = {"host", "transfer-encoding", "connection"}
+backend_client: httpx.AsyncClient | None = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the backend client on startup and close it on shutdown."""
+    global backend_client
+    backend_client = httpx.AsyncClient(
+        base_url=BACKEND_BASE_URL,
+        timeout=30,  # Add a timeout to prevent hanging requests
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    )
+    try:
+        yield
+    finally:
+        await backend_client.aclose()
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 origins = [
@@ -51,77 +75,8 @@ app.add_middleware(
 
 
 
-# Initialize the database
-my_db = MyDB("workspace/db.json")  # Initialize MyDB
-
-# Load configuration from secret.ini
-config = configparser.ConfigParser()
-config.read('workspace/secret.ini')
-
-# Get the secret key from secret.ini
-SECRET_KEY = config.get('security', 'secret_key')
-
-# Initialize JWTToken class
-jwt_token_handler = JWTToken(secret_key=SECRET_KEY)
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Security scheme
-http_bearer = HTTPBearer()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-async def get_user(username: str):
-    """Retrieve user data based on username."""
-    return my_db.get_user(username)
-
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(http_bearer)):
-    """Dependency to get the current user from the JWT token."""
-    token = credentials.credentials
-    logger("get_current_user: ", token)
-    username = jwt_token_handler.verify_token(token)
-    logger("get_current_user: ", username)
-    if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = await get_user(username)
-    logger("get_current_user: ", user)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-    return user
-
-
-@app.post("/auth/token")  # Moved from router
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    """Endpoint to obtain a JWT access token."""
-    logger(f"SECRET_KEY: {SECRET_KEY}")  # Add this line
-    user = await get_user(form_data.username)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    if not verify_password(form_data.password, user["password"]):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    access_token = jwt_token_handler.create_access_token(username=form_data.username)
-    logger(f"access token created: ", access_token)
-    return {"access_token": access_token, "token_type": "bearer"}
-
+# Authentication endpoints (/auth/token); registered before the catch-all
+app.include_router(jwt_auth_router)
 
 
 # Catch-all route for unmatched requests
@@ -130,41 +85,50 @@ async def proxy_to_backend(request: Request, anypath: str, current_user: Dict[st
     """
     Proxies all requests to the backend server after JWT authentication.
     """
-    backend_port = int(os.environ.get("BACKEND_PORT"))
-    backend_url = f"http://backend:6000/{anypath}"  # Construct backend URL
-
-    logger(f"Proxying request to: {backend_url}")
+    _log.debug("Proxying request to: %s/%s", BACKEND_BASE_URL, anypath)
 
     try:
-        # Extract request body
-        body = await request.body()
+        # Stream the request body through instead of buffering it; skip it
+        # entirely when the client sent none so GETs aren't sent chunked
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        body = request.stream() if has_body else None
+
+        # A list of pairs, not a dict, so repeated headers keep every value
+        headers = [
+            (key, value) for key, value in request.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        ]
 
         # Make the request to the backend server
-        async with httpx.AsyncClient() as client:
-            backend_response = await client.request(
-                method=request.method,
-                url=backend_url,
-                headers=request.headers,
-                content=body,
-                params=request.query_params,
-                timeout=30  # Add a timeout to prevent hanging requests
-            )
-
-        # Return the backend response to the client
-        return StreamingResponse(
-            backend_response.aiter_bytes(),
+        backend_request = backend_client.build_request(
+            method=request.method,
+            url=f"/{anypath}",
+            headers=headers,
+            content=body,
+            params=request.query_params,
+        )
+        backend_response = await backend_client.send(backend_request, stream=True)
+
+        # Return the backend response to the client as-is (still encoded)
+        response = StreamingResponse(
+            backend_response.aiter_raw(),
             status_code=backend_response.status_code,
-            headers=backend_response.headers,
+            background=BackgroundTask(backend_response.aclose),
         )
+        # Append one by one so repeated headers (e.g. Set-Cookie) stay separate
+        for key, value in backend_response.headers.multi_items():
+            if key.lower() not in HOP_BY_HOP_HEADERS:
+                response.headers.append(key, value)
+        return response
 
     except httpx.TimeoutException as e:
-        logger(f"Backend request timed out: {e}")
+        _log.warning("Backend request timed out: %s", e)
         raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Backend request timed out")
     except httpx.RequestError as e:
-        logger(f"Error connecting to backend: {e}")
+        _log.warning("Error connecting to backend: %s", e)
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Error connecting to backend")
     except Exception as e:
-        logger(f"Unexpected error: {e}")
+        _log.exception("Unexpected error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
@@ -174,4 +138,10 @@ if __name__ == "__main__":
     import uvicorn
 
     auth_port = int(os.environ.get("AUTH_PORT", 8000))  # Default to 8000 if not set
-    uvicorn.run(app, host="0.0.0.0", port=auth_port, reload=True)
\ No newline at end of file
+    if os.environ.get("DEV"):
+        # Auto-reload runs a single worker and is for local development only
+        uvicorn.run("main:app", host="0.0.0.0", port=auth_port, reload=True)
+    else:
+        auth_workers = int(os.environ.get("AUTH_WORKERS", os.cpu_count() or 1))
+        uvicorn.run("main:app", host="0.0.0.0", port=auth_port, workers=auth_workers,
+                    loop="uvloop", http="httptools")
\ No newline at end of file
@@ -1,19 +1,121 @@
 # mydb.py
-from tinydb import TinyDB, Query
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from typing import Dict, Any, List
 from passlib.context import CryptContext  # For password hashing
 
-# Password hashing context (same as jwt_auth.py)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Database files used by the app, relative to src/
+DB_PATH = "workspace/db.sqlite3"
+LEGACY_JSON_PATH = "workspace/db.json"
+
+# Password hashing context (shared with jwt_auth_router.py)
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
 
 
 class MyDB:
-    def __init__(self, db_path: str):
+    # Fields stored in their own columns; any other user field is kept as
+    # JSON in the extra column
+    COLUMNS = ("username", "password", "email")
+
+    # SQL is kept constant so sqlite3's statement cache reuses the prepared statements
+    _CREATE_SQL = "CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT, email TEXT, extra TEXT)"
+    _GET_SQL = "SELECT username, password, email, extra FROM users WHERE username = ?"
+    _GET_EXTRA_SQL = "SELECT extra FROM users WHERE username = ?"
+    _INSERT_SQL = "INSERT INTO users (username, password, email, extra) VALUES (?, ?, ?, ?)"
+    _INSERT_IGNORE_SQL = "INSERT OR IGNORE INTO users (username, password, email, extra) VALUES (?, ?, ?, ?)"
+    _DELETE_SQL = "DELETE FROM users WHERE username = ?"
+    _ALL_SQL = "SELECT username, password, email, extra FROM users"
+    _COUNT_SQL = "SELECT COUNT(*) FROM users"
+    _CLEAR_SQL = "DELETE FROM users"
+
+    def __init__(self, db_path: str, legacy_json_path: str | None = None):
         """
-        Initializes the MyDB class with the path to the TinyDB database file.
+        Initializes the MyDB class with the path to the SQLite database file.
+
+        Safe to run from several processes at once: schema setup and the
+        legacy import happen in one write transaction, so only the first
+        process imports and the others see the populated table.
+
+        Args:
+            db_path: The path to the SQLite database file.
+            legacy_json_path: An optional TinyDB JSON file whose users are imported
+                when the SQLite database is still empty.
         """
-        self.db = TinyDB(db_path)
-        self.User = Query()
+        # Wait for other processes' write transactions instead of failing fast
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # The write connection is shared by the threadpool, so serialize access to it
+        self.lock = threading.Lock()
+        # Reads use one connection per thread instead; under WAL they read the
+        # last committed data without waiting on the writer or its lock
+        self._db_path = db_path
+        self._readers = threading.local()
+
+        with self._transaction():
+            self.conn.execute(self._CREATE_SQL)
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(users)")}
+            if "extra" not in columns:
+                self.conn.execute("ALTER TABLE users ADD COLUMN extra TEXT")
+            if (legacy_json_path and os.path.exists(legacy_json_path)
+                    and not self.conn.execute(self._COUNT_SQL).fetchone()[0]):
+                self._import_tinydb_json(legacy_json_path)
+
+    def _reader(self) -> sqlite3.Connection:
+        """Returns the calling thread's read-only connection, opening it on first use."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            self._readers.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Runs the block in one BEGIN IMMEDIATE transaction, rolling back on error."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _import_tinydb_json(self, json_path: str):
+        """Copies the users of a TinyDB JSON file into the users table. Call inside a transaction."""
+        with open(json_path) as f:
+            tables = json.load(f)
+        for user_data in tables.get("_default", {}).values():
+            self.conn.execute(self._INSERT_IGNORE_SQL, self._user_params(user_data))
+
+    def _user_params(self, user_data: Dict[str, Any]) -> tuple:
+        """Splits user data into the column values and the JSON-encoded extra fields."""
+        extra = {key: value for key, value in user_data.items() if key not in self.COLUMNS}
+        return (
+            user_data["username"],
+            user_data.get("password"),
+            user_data.get("email"),
+            json.dumps(extra) if extra else None,
+        )
+
+    @staticmethod
+    def _row_to_user(row: sqlite3.Row) -> Dict[str, Any]:
+        """Turns a users row back into a user dict, merging in the extra fields."""
+        user = {"username": row["username"], "password": row["password"], "email": row["email"]}
+        if row["extra"]:
+            user.update(json.loads(row["extra"]))
+        return user
 
     def get_user(self, username: str) -> Dict[str, Any] | None:
         """
@@ -25,11 +127,8 @@ class MyDB:
         Returns:
             A dictionary containing the user data, or None if the user is not found.
         """
-        result = self.db.search(self.User.username == username)
-        if result:
-            return result[0]  # Return the first match
-        else:
-            return None
+        row = self._reader().execute(self._GET_SQL, (username,)).fetchone()
+        return self._row_to_user(row) if row is not None else None
 
     def insert_user(self, user_data: Dict[str, Any]):
         """Inserts a new user into the database.
@@ -37,7 +136,8 @@ class MyDB:
         Args:
             user_data: A dictionary containing the user's data, including username and password.
         """
-        self.db.insert(user_data)
+        with self.lock:
+            self.conn.execute(self._INSERT_SQL, self._user_params(user_data))
 
     def update_user(self, username: str, updates: Dict[str, Any]):
         """Updates a user's information in the database.
@@ -46,7 +146,24 @@ class MyDB:
             username: The username of the user to update.
             updates: A dictionary containing the fields to update and their new values.
         """
-        self.db.update(updates, self.User.username == username)
+        column_updates = {key: value for key, value in updates.items() if key in self.COLUMNS}
+        extra_updates = {key: value for key, value in updates.items() if key not in self.COLUMNS}
+        if not updates:
+            return
+        with self._transaction():
+            if extra_updates:
+                row = self.conn.execute(self._GET_EXTRA_SQL, (username,)).fetchone()
+                if row is None:
+                    return
+                extra = json.loads(row["extra"]) if row["extra"] else {}
+                extra.update(extra_updates)
+                column_updates["extra"] = json.dumps(extra)
+            # Column names come from COLUMNS or "extra" only, so building the SET clause is safe
+            assignments = ", ".join(f"{column} = ?" for column in column_updates)
+            self.conn.execute(
+                f"UPDATE users SET {assignments} WHERE username = ?",
+                (*column_updates.values(), username),
+            )
 
     def delete_user(self, username: str):
         """Deletes a user from the database.
@@ -54,20 +171,22 @@ class MyDB:
         Args:
             username: The username of the user to delete.
         """
-        self.db.remove(self.User.username == username)
+        with self.lock:
+            self.conn.execute(self._DELETE_SQL, (username,))
 
     def all_users(self) -> List[Dict[str, Any]]:
       """Returns a list of all users in the database."""
-      return self.db.all()
+      return [self._row_to_user(row) for row in self._reader().execute(self._ALL_SQL)]
 
     def clear_db(self):
         """Clears all data from the database.  Use with caution!"""
-        self.db.truncate()
+        with self.lock:
+            self.conn.execute(self._CLEAR_SQL)
 
 
 if __name__ == '__main__':
     # Example Usage (for database writing/management)
-    db = MyDB("workspace/db.json")  # Same path as in jwt_auth.py
+    db = MyDB(DB_PATH, legacy_json_path=LEGACY_JSON_PATH)  # Same path as in jwt_auth_router.py
 
     # Clear the database before running tests (CAREFUL!)
     # db.clear_db()
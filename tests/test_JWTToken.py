@@ -0,0 +1,124 @@
+# test_JWTToken.py
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from JWTToken import JWTToken
+
+SECRET_KEY = "test-secret-key-that-is-long-enough-for-hs256"
+
+
+@pytest.fixture
+def token_handler():
+    return JWTToken(SECRET_KEY)
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _sign(header: dict, claims: dict) -> str:
+    """Builds a token with a valid HS256 signature under SECRET_KEY, whatever the header says."""
+    signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(claims).encode())}"
+    signature = hmac.new(SECRET_KEY.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+def test_create_access_token_matches_pyjwt(token_handler):
+    token = token_handler.create_access_token("alice")
+    exp = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])["exp"]
+    assert token == jwt.encode({"sub": "alice", "exp": exp}, SECRET_KEY, algorithm="HS256")
+
+
+@pytest.mark.parametrize("algorithm", ["HS384", "HS512"])
+def test_create_access_token_matches_pyjwt_other_hmac(algorithm):
+    secret_key = SECRET_KEY * 2  # long enough for HS512
+    token_handler = JWTToken(secret_key, algorithm=algorithm)
+    token = token_handler.create_access_token("alice")
+    exp = jwt.decode(token, secret_key, algorithms=[algorithm])["exp"]
+    assert token == jwt.encode({"sub": "alice", "exp": exp}, secret_key, algorithm=algorithm)
+    assert token_handler.verify_token(token) == "alice"
+
+
+def test_verify_token_roundtrip(token_handler):
+    token = token_handler.create_access_token("alice")
+    assert token_handler.verify_token(token) == "alice"
+    # Second call is served from the cache
+    assert token_handler.verify_token(token) == "alice"
+
+
+def test_verify_token_accepts_pyjwt_token(token_handler):
+    token = jwt.encode({"sub": "alice", "exp": int(time.time()) + 60}, SECRET_KEY, algorithm="HS256")
+    assert token_handler.verify_token(token) == "alice"
+
+
+def test_verify_token_rejects_bad_signature(token_handler):
+    token = jwt.encode({"sub": "alice", "exp": int(time.time()) + 60}, SECRET_KEY + "x", algorithm="HS256")
+    assert token_handler.verify_token(token) is None
+
+
+def test_verify_token_rejects_tampered_payload(token_handler):
+    header, _, signature = token_handler.create_access_token("alice").split(".")
+    payload = _b64url(b'{"sub":"admin","exp":9999999999}')
+    assert token_handler.verify_token(f"{header}.{payload}.{signature}") is None
+
+
+def test_verify_token_rejects_expired(token_handler):
+    token = token_handler.create_access_token("alice", expires_delta=timedelta(seconds=-5))
+    assert token_handler.verify_token(token) is None
+
+
+def test_verify_token_rejects_alg_none(token_handler):
+    header = _b64url(b'{"alg":"none","typ":"JWT"}')
+    payload = _b64url(f'{{"sub":"alice","exp":{int(time.time()) + 60}}}'.encode())
+    assert token_handler.verify_token(f"{header}.{payload}.") is None
+
+
+@pytest.mark.parametrize("header", [
+    {"alg": "none", "typ": "JWT"},
+    {"alg": "HS512", "typ": "JWT"},
+    {"typ": "JWT"},
+])
+def test_verify_token_rejects_header_alg_mismatch(token_handler, header):
+    token = _sign(header, {"sub": "alice", "exp": int(time.time()) + 60})
+    assert token_handler.verify_token(token) is None
+
+
+def test_verify_token_accepts_other_header_with_matching_alg(token_handler):
+    token = _sign({"typ": "JWT", "alg": "HS256", "kid": "1"}, {"sub": "alice", "exp": int(time.time()) + 60})
+    assert token_handler.verify_token(token) == "alice"
+
+
+@pytest.mark.parametrize("claims", [{"sub": 123}, {"sub": ["alice"]}, {"sub": "alice", "jti": 1}])
+def test_verify_token_rejects_non_string_sub_and_jti(token_handler, claims):
+    token = jwt.encode({**claims, "exp": int(time.time()) + 60}, SECRET_KEY, algorithm="HS256")
+    assert token_handler.verify_token(token) is None
+
+
+def test_verify_token_rejects_future_nbf(token_handler):
+    now = int(time.time())
+    token = jwt.encode({"sub": "alice", "exp": now + 60, "nbf": now + 1000}, SECRET_KEY, algorithm="HS256")
+    assert token_handler.verify_token(token) is None
+
+
+def test_verify_token_rejects_unexpected_audience(token_handler):
+    token = jwt.encode({"sub": "alice", "exp": int(time.time()) + 60, "aud": "other"}, SECRET_KEY, algorithm="HS256")
+    assert token_handler.verify_token(token) is None
+
+
+@pytest.mark.parametrize("claims", [{"exp": 9999999999}, {"sub": "alice"}])
+def test_verify_token_requires_sub_and_exp(token_handler, claims):
+    token = jwt.encode(claims, SECRET_KEY, algorithm="HS256")
+    assert token_handler.verify_token(token) is None
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "a.b.c", "a.b.!!!"])
+def test_verify_token_rejects_malformed(token_handler, token):
+    assert token_handler.verify_token(token) is None
@@ -0,0 +1,134 @@
+# test_jwt_auth_router.py
+
+import importlib
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from config import get_settings
+
+# Low-cost bcrypt, standing in for hashes created before the argon2 switch
+bcrypt_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+@pytest.fixture
+def load_router(tmp_path, monkeypatch):
+    """Imports a fresh jwt_auth_router against a temporary workspace/."""
+    def load(password_cache_ttl: str | None = None):
+        monkeypatch.chdir(tmp_path)
+        workspace = tmp_path / "workspace"
+        workspace.mkdir(exist_ok=True)
+        (workspace / "secret.ini").write_text("[security]\nsecret_key = test-secret-key-that-is-long-enough\n")
+        if password_cache_ttl is None:
+            monkeypatch.delenv("PASSWORD_CACHE_TTL", raising=False)
+        else:
+            monkeypatch.setenv("PASSWORD_CACHE_TTL", password_cache_ttl)
+        get_settings.cache_clear()
+        sys.modules.pop("jwt_auth_router", None)
+        return importlib.import_module("jwt_auth_router")
+
+    yield load
+    sys.modules.pop("jwt_auth_router", None)
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def count_verify(monkeypatch):
+    """Counts calls to the real password verify, i.e. cache misses."""
+    def install(router):
+        calls = []
+        verify = router.pwd_context.verify
+
+        def counting_verify(*args, **kwargs):
+            calls.append(args)
+            return verify(*args, **kwargs)
+
+        monkeypatch.setattr(router.pwd_context, "verify", counting_verify)
+        return calls
+
+    return install
+
+
+def _client(router) -> TestClient:
+    app = FastAPI()
+    app.include_router(router.jwt_auth_router)
+    return TestClient(app)
+
+
+def test_login_rehashes_bcrypt_to_argon2(load_router):
+    router = load_router()
+    router.my_db.insert_user({"username": "alice", "password": bcrypt_context.hash("pw")})
+
+    with _client(router) as client:
+        response = client.post("/auth/token", data={"username": "alice", "password": "pw"})
+
+    assert response.status_code == 200
+    assert router.my_db.get_user("alice")["password"].startswith("$argon2id$")
+    # The upgraded hash still verifies
+    assert router.verify_password("alice", "pw", router.my_db.get_user("alice")["password"])
+
+
+def test_failed_login_keeps_bcrypt_hash(load_router):
+    router = load_router()
+    bcrypt_hash = bcrypt_context.hash("pw")
+    router.my_db.insert_user({"username": "alice", "password": bcrypt_hash})
+
+    with _client(router) as client:
+        response = client.post("/auth/token", data={"username": "alice", "password": "wrong"})
+
+    assert response.status_code == 401
+    assert router.my_db.get_user("alice")["password"] == bcrypt_hash
+
+
+def test_password_cache_is_off_by_default(load_router, count_verify):
+    router = load_router()
+    calls = count_verify(router)
+    stored_hash = bcrypt_context.hash("pw")
+
+    assert router.verify_password("alice", "pw", stored_hash)
+    assert router.verify_password("alice", "pw", stored_hash)
+    assert len(calls) == 2
+
+
+def test_password_cache_hits_for_same_credentials(load_router, count_verify):
+    router = load_router(password_cache_ttl="60")
+    calls = count_verify(router)
+    stored_hash = bcrypt_context.hash("pw")
+
+    assert router.verify_password("alice", "pw", stored_hash)
+    assert router.verify_password("alice", "pw", stored_hash)
+    assert len(calls) == 1
+
+
+def test_password_cache_rejects_wrong_password(load_router, count_verify):
+    router = load_router(password_cache_ttl="60")
+    calls = count_verify(router)
+    stored_hash = bcrypt_context.hash("pw")
+
+    assert router.verify_password("alice", "pw", stored_hash)
+    assert not router.verify_password("alice", "wrong", stored_hash)
+    assert len(calls) == 2
+
+
+def test_password_cache_misses_after_hash_change(load_router, count_verify):
+    router = load_router(password_cache_ttl="60")
+    calls = count_verify(router)
+    old_hash = bcrypt_context.hash("pw")
+    new_hash = bcrypt_context.hash("new-pw")
+
+    assert router.verify_password("alice", "pw", old_hash)
+    assert not router.verify_password("alice", "pw", new_hash)
+    assert router.verify_password("alice", "new-pw", new_hash)
+    assert len(calls) == 3
+
+
+def test_cached_login_rejects_wrong_password(load_router):
+    router = load_router(password_cache_ttl="60")
+    router.my_db.insert_user({"username": "alice", "password": router.pwd_context.hash("pw")})
+
+    with _client(router) as client:
+        assert client.post("/auth/token", data={"username": "alice", "password": "pw"}).status_code == 200
+        assert client.post("/auth/token", data={"username": "alice", "password": "wrong"}).status_code == 401
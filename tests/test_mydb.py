@@ -0,0 +1,149 @@
+# test_mydb.py
+
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from mydb import MyDB
+
+
+def _write_legacy_json(path, users):
+    path.write_text(json.dumps({"_default": {str(i): user for i, user in enumerate(users, 1)}}))
+
+
+def _open_db(db_path, json_path):
+    MyDB(db_path, legacy_json_path=json_path)
+
+
+def test_import_keeps_extra_fields(tmp_path):
+    json_path = tmp_path / "db.json"
+    _write_legacy_json(json_path, [
+        {"username": "alice", "password": "hash", "role": "admin"},
+        {"username": "bob", "password": "hash2", "email": "bob@example.com"},
+    ])
+    db = MyDB(str(tmp_path / "db.sqlite3"), legacy_json_path=str(json_path))
+
+    assert db.get_user("alice") == {"username": "alice", "password": "hash", "email": None, "role": "admin"}
+    assert db.get_user("bob")["email"] == "bob@example.com"
+    assert len(db.all_users()) == 2
+
+
+def test_import_runs_only_into_empty_table(tmp_path):
+    json_path = tmp_path / "db.json"
+    db_path = str(tmp_path / "db.sqlite3")
+    _write_legacy_json(json_path, [{"username": "alice", "password": "hash"}])
+    MyDB(db_path, legacy_json_path=str(json_path)).delete_user("alice")
+    MyDB(db_path).insert_user({"username": "carol", "password": "hash"})
+
+    db = MyDB(db_path, legacy_json_path=str(json_path))
+    assert db.get_user("alice") is None
+    assert db.get_user("carol") is not None
+
+
+def test_failed_import_rolls_back(tmp_path):
+    json_path = tmp_path / "db.json"
+    db_path = str(tmp_path / "db.sqlite3")
+    # The second user has no username, so the import fails partway through
+    _write_legacy_json(json_path, [{"username": "alice", "password": "hash"}, {"password": "hash"}])
+    with pytest.raises(KeyError):
+        MyDB(db_path, legacy_json_path=str(json_path))
+
+    # Nothing was left behind, so a fixed file is still imported
+    _write_legacy_json(json_path, [{"username": "alice", "password": "hash"}])
+    assert MyDB(db_path, legacy_json_path=str(json_path)).get_user("alice") is not None
+
+
+def test_concurrent_import(tmp_path):
+    json_path = tmp_path / "db.json"
+    db_path = str(tmp_path / "db.sqlite3")
+    _write_legacy_json(json_path, [{"username": f"user{i}", "password": "hash"} for i in range(200)])
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_open_db, args=(db_path, str(json_path))) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+    assert len(MyDB(db_path).all_users()) == 200
+
+
+def test_update_user_columns_and_extra_fields(tmp_path):
+    db = MyDB(str(tmp_path / "db.sqlite3"))
+    db.insert_user({"username": "alice", "password": "hash", "role": "user"})
+
+    db.update_user("alice", {"password": "new-hash", "role": "admin", "team": "ops"})
+
+    assert db.get_user("alice") == {
+        "username": "alice", "password": "new-hash", "email": None, "role": "admin", "team": "ops",
+    }
+
+
+def test_update_missing_user_is_noop(tmp_path):
+    db = MyDB(str(tmp_path / "db.sqlite3"))
+    db.update_user("nobody", {"role": "admin"})
+    assert db.get_user("nobody") is None
+
+
+def _get_user_in_thread(db, username):
+    """Runs get_user on a fresh thread, returning (user, seconds taken)."""
+    result = {}
+
+    def run():
+        start = time.monotonic()
+        result["user"] = db.get_user(username)
+        result["elapsed"] = time.monotonic() - start
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    return result["user"], result["elapsed"]
+
+
+def test_get_user_does_not_wait_for_writer_lock(tmp_path):
+    db = MyDB(str(tmp_path / "db.sqlite3"))
+    db.insert_user({"username": "alice", "password": "hash"})
+
+    with db.lock:
+        user, elapsed = _get_user_in_thread(db, "alice")
+
+    assert user["username"] == "alice"
+    assert elapsed < 1
+
+
+def test_get_user_reads_during_other_process_write(tmp_path):
+    db_path = str(tmp_path / "db.sqlite3")
+    db = MyDB(db_path)
+    db.insert_user({"username": "alice", "password": "hash"})
+
+    # Another worker holding an open write transaction
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("INSERT INTO users (username, password) VALUES ('bob', 'hash')")
+    try:
+        user, elapsed = _get_user_in_thread(db, "alice")
+        assert user["username"] == "alice"
+        assert elapsed < 1
+        # Uncommitted rows stay invisible to readers
+        assert _get_user_in_thread(db, "bob")[0] is None
+    finally:
+        other.execute("COMMIT")
+        other.close()
+
+    assert db.get_user("bob") is not None
+
+
+def test_reads_see_committed_writes(tmp_path):
+    db = MyDB(str(tmp_path / "db.sqlite3"))
+    assert db.get_user("alice") is None
+    db.insert_user({"username": "alice", "password": "hash"})
+    db.update_user("alice", {"password": "new-hash"})
+    assert db.get_user("alice")["password"] == "new-hash"
+    db.delete_user("alice")
+    assert db.get_user("alice") is None